@@ -3,22 +3,59 @@
 """
 将 Markdown 文件转换为 HTML，支持目录跳转
 """
+import glob
+import hashlib
+import os
 import re
-from markdown import markdown
-from markdown.extensions import codehilite, fenced_code, tables, toc
-from markdown.extensions.toc import slugify
+import sys
+import unicodedata
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from pathlib import Path
 
+from cmarkgfm import markdown_to_html_with_extensions as md_to_html
+from cmarkgfm.cmark import Options
+from lxml import html as lxml_html
 
-def slugify_chinese(text, separator='-'):
+_HEADING_TAGS = ('h1', 'h2', 'h3', 'h4', 'h5', 'h6')
+
+# 需要从标题/链接文本中移除的 emoji（str.translate 删除表）
+_EMOJI_ZAP = str.maketrans('', '', '📚🔧🌐📝📖')
+
+# 预编译正则，避免每次调用都走 re 模块的缓存查找
+_NUM_PREFIX_RE = re.compile(r'^\d+\.\s*')
+_NON_WORD_RE = re.compile(r'[^\w\s-]')
+_SLUG_SEP_RE = re.compile(r'[-\s]+')
+_HASH_STRIP_RE = re.compile(r'[^\w\s\u4e00-\u9fff]')
+_NORMALIZE_RE = re.compile(r'[\W_]+')
+
+# 正文中原样出现的文档级标签（<!DOCTYPE>、<html>、<head>、<body>）。
+# libxml2 按片段解析时会丢弃或重组这些标签，解析前先替换为占位符，序列化后再还原
+_DOC_TAG_RE = re.compile(r'<!doctype[^>]*>|</?(?:html|head|body)(?:\s[^>]*)?>', re.IGNORECASE)
+_DOC_TAG_MARK_RE = re.compile('\ufdd0([\ue000-\uf8ff])')
+
+
+def slugify(value):
+    """生成 ASCII 锚点（与 python-markdown toc 扩展的 slugify 行为一致）"""
+    # 纯 ASCII 文本无需 NFKD 分解，直接跳过 unicodedata 查表
+    if not value.isascii():
+        value = unicodedata.normalize('NFKD', value)
+        value = value.encode('ascii', 'ignore').decode('ascii')
+    value = _NON_WORD_RE.sub('', value).strip().lower()
+    return _SLUG_SEP_RE.sub('-', value)
+
+
+@lru_cache(maxsize=4096)
+def slugify_chinese(text):
     """处理中文标题的锚点生成"""
     # 先使用默认的 slugify
-    slug = slugify(text, separator)
+    slug = slugify(text)
     # 如果结果是空的（中文情况），使用哈希值
     if not slug or len(slug) < 3:
         # 使用标题的哈希值作为锚点
-        import hashlib
         # 移除 emoji 和特殊字符
-        clean_text = re.sub(r'[^\w\s\u4e00-\u9fff]', '', text)
+        clean_text = _HASH_STRIP_RE.sub('', text)
         # 生成简短的哈希值
         hash_obj = hashlib.md5(clean_text.encode('utf-8'))
         hash_hex = hash_obj.hexdigest()[:8]
@@ -35,386 +72,374 @@ def slugify_chinese(text, separator='-'):
     return slug
 
 
-def add_anchor_ids(html_content):
-    """为所有标题添加 id 属性"""
-    # 匹配所有标题标签
-    def add_id(match):
-        tag = match.group(1)  # h1, h2, h3, etc.
-        content = match.group(2)  # 标题内容
-        # 生成锚点 ID
-        anchor_id = slugify_chinese(content)
-        return f'<{tag} id="{anchor_id}">{content}</{tag}>'
-    
-    # 匹配 <h1>到<h6>标签
-    pattern = r'<h([1-6])>(.*?)</h[1-6]>'
-    html_content = re.sub(pattern, add_id, html_content)
-    return html_content
+@lru_cache(maxsize=4096)
+def _clean_text(text):
+    """清理标题/链接文本：移除 emoji 和开头的数字编号"""
+    clean_text = text.translate(_EMOJI_ZAP).strip()  # 移除 emoji
+    return _NUM_PREFIX_RE.sub('', clean_text)  # 移除开头的数字编号
 
 
-def extract_heading_map(html_content):
-    """提取所有标题及其 id，建立映射关系"""
+def annotate_and_map(tree):
+    """为所有标题添加 id 属性，同时建立 标题文本 -> id 的映射"""
     heading_map = {}
-    # 匹配所有标题标签及其 id
-    pattern = r'<h([1-6]) id="([^"]+)">(.*?)</h[1-6]>'
+    headings = list(tree.iter(*_HEADING_TAGS))
+    # 作者在原始 HTML 中写好的 id 保持不变，生成的 id 也要避开它们
+    used_ids = {h.get('id') for h in headings if h.get('id')}
     
-    for match in re.finditer(pattern, html_content):
-        level = match.group(1)
-        heading_id = match.group(2)
-        heading_text = match.group(3)
-        
-        # 清理标题文本（移除 HTML 标签和 emoji）
-        clean_text = re.sub(r'<[^>]+>', '', heading_text)  # 移除 HTML 标签
-        clean_text = re.sub(r'[📚🔧🌐📝📖]', '', clean_text).strip()  # 移除 emoji
-        clean_text = re.sub(r'^\d+\.\s*', '', clean_text)  # 移除开头的数字编号
+    for heading in headings:
+        # 标题的纯文本（不含 <code> 等内联标签）
+        content = heading.text_content()
+        # 清理标题文本（移除 emoji 和数字编号）
+        clean_text = _clean_text(content)
+        
+        anchor_id = heading.get('id')
+        if not anchor_id:
+            # 生成锚点 ID
+            anchor_id = slugify_chinese(content)
+            # 重复的标题追加 _1、_2 后缀，保证 id 唯一
+            base_id, n = anchor_id, 0
+            while anchor_id in used_ids:
+                n += 1
+                anchor_id = f"{base_id}_{n}"
+            used_ids.add(anchor_id)
+            heading.set('id', anchor_id)
         
         # 存储映射：文本 -> id
-        heading_map[clean_text] = heading_id
+        heading_map[clean_text] = anchor_id
         # 也存储原始文本的映射
-        heading_map[heading_text] = heading_id
+        heading_map[content] = anchor_id
     
     return heading_map
 
 
-def fix_toc_links(html_content):
-    """修复目录链接，确保指向正确的锚点"""
-    # 先提取所有标题的映射
-    heading_map = extract_heading_map(html_content)
-    
-    # 修复目录中的链接
-    def fix_toc_link(match):
-        full_link = match.group(0)
-        link_text = match.group(1)
-        
-        # 清理链接文本
-        clean_text = re.sub(r'<[^>]+>', '', link_text)
-        clean_text = re.sub(r'[📚🔧🌐📝📖]', '', clean_text).strip()
-        clean_text = re.sub(r'^\d+\.\s*', '', clean_text)
-        
-        # 查找匹配的标题 id
-        heading_id = None
-        # 精确匹配
-        if clean_text in heading_map:
-            heading_id = heading_map[clean_text]
-        else:
-            # 模糊匹配：查找包含该文本的标题
-            for heading_text, h_id in heading_map.items():
-                if clean_text in heading_text or heading_text in clean_text:
-                    heading_id = h_id
-                    break
-        
-        # 如果找到了匹配的 id，使用它；否则使用生成的锚点
-        if heading_id:
-            return f'<a href="#{heading_id}">{link_text}</a>'
-        else:
-            # 回退：使用文本生成锚点
-            anchor = slugify_chinese(clean_text)
-            return f'<a href="#{anchor}">{link_text}</a>'
-    
-    # 匹配目录中的链接（在 <ol> 或 <ul> 内的链接，通常在目录区域）
-    # 先找到目录区域（通常在 <h2>目录</h2> 之后的 <ol>）
-    toc_pattern = r'(<h[1-6][^>]*>.*?目录.*?</h[1-6]>.*?<ol>.*?</ol>)'
-    
-    def process_toc(match):
-        toc_content = match.group(1)
-        # 修复目录中的链接
-        link_pattern = r'<a href="[^"]*">(.*?)</a>'
-        toc_content = re.sub(link_pattern, fix_toc_link, toc_content)
-        return toc_content
-    
-    html_content = re.sub(toc_pattern, process_toc, html_content, flags=re.DOTALL)
-    
-    # 也处理其他手动编写的目录链接
-    manual_link_pattern = r'<a href="(#.*?)">(.*?)</a>'
-    def fix_manual_link(match):
-        href = match.group(1)
-        text = match.group(2)
-        # 如果已经是 # 开头，尝试匹配标题
-        if href.startswith('#'):
-            clean_text = re.sub(r'<[^>]+>', '', text)
-            clean_text = re.sub(r'[📚🔧🌐📝📖]', '', clean_text).strip()
-            clean_text = re.sub(r'^\d+\.\s*', '', clean_text)
-            
-            if clean_text in heading_map:
-                return f'<a href="#{heading_map[clean_text]}">{text}</a>'
-            else:
-                # 模糊匹配
-                for heading_text, h_id in heading_map.items():
-                    if clean_text in heading_text or heading_text in clean_text:
-                        return f'<a href="#{h_id}">{text}</a>'
-                # 回退
-                anchor = slugify_chinese(clean_text)
-                return f'<a href="#{anchor}">{text}</a>'
-        return match.group(0)
+@lru_cache(maxsize=4096)
+def _normalize_key(text):
+    """激进归一化：在 _clean_text 基础上转小写，并去掉空白、标点和 emoji"""
+    return _NORMALIZE_RE.sub('', _clean_text(text).lower())
+
+
+def _trigrams(text):
+    """返回文本的所有三字符片段"""
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def build_heading_index(heading_map):
+    """为标题映射建立归一化索引和三元组索引，避免对每个链接线性扫描所有标题"""
+    entries = list(heading_map.items())
+    normalized_map = {}
+    trigram_index = defaultdict(set)
+    trigram_counts = []
+    short_ids = set()  # 不足 3 个字符、没有三元组的标题
     
-    html_content = re.sub(manual_link_pattern, fix_manual_link, html_content)
+    for i, (heading_text, h_id) in enumerate(entries):
+        normalized_map.setdefault(_normalize_key(heading_text), h_id)
+        grams = _trigrams(heading_text)
+        trigram_counts.append(len(grams))
+        if not grams:
+            short_ids.add(i)
+        for gram in grams:
+            trigram_index[gram].add(i)
     
-    return html_content
+    return entries, normalized_map, trigram_index, trigram_counts, short_ids
 
 
-def convert_markdown_to_html(md_file: str, html_file: str):
-    """将 Markdown 文件转换为 HTML"""
-    with open(md_file, 'r', encoding='utf-8') as f:
-        md_content = f.read()
-    
-    # 配置 Markdown 扩展
-    extensions = [
-        'codehilite',
-        'fenced_code',
-        'tables',
-        'toc',
-        'nl2br',
-    ]
+def find_heading_id(clean_text, heading_index):
+    """精确匹配失败后，借助索引查找与链接文本匹配的标题 id，找不到时返回 None"""
+    entries, normalized_map, trigram_index, trigram_counts, short_ids = heading_index
+    # 归一化后精确匹配
+    heading_id = normalized_map.get(_normalize_key(clean_text))
+    if heading_id:
+        return heading_id
     
-    # 自定义 slugify 函数处理中文
-    toc_config = {
-        'permalink': False,  # 不在标题旁显示链接图标
-        'slugify': slugify_chinese,
-        'toc_depth': 3,  # 目录深度
-    }
+    # 模糊匹配：查找包含该文本（或被该文本包含）的标题
+    grams = _trigrams(clean_text)
+    if grams:
+        # 标题包含链接文本 => 标题含有链接文本的全部三元组
+        hits = Counter(i for gram in grams for i in trigram_index.get(gram, ()))
+        candidates = {i for i, n in hits.items() if n == len(grams)}
+        # 链接文本包含标题 => 标题的全部三元组都出现在链接文本中
+        candidates.update(i for i, n in hits.items() if n == trigram_counts[i])
+        candidates.update(short_ids)
+        candidates = sorted(candidates)
+    else:
+        # 链接文本太短，无法用三元组过滤
+        candidates = range(len(entries))
     
-    # 转换为 HTML
-    html_body = markdown(
-        md_content,
-        extensions=extensions,
-        extension_configs={
-            'codehilite': {
-                'css_class': 'highlight',
-                'use_pygments': True,
-            },
-            'toc': toc_config
-        }
-    )
+    for i in candidates:
+        heading_text, h_id = entries[i]
+        if clean_text in heading_text or heading_text in clean_text:
+            return h_id
+    return None
+
+
+def fix_toc_links(tree, heading_map):
+    """修复目录（及其他手动编写的）链接，确保指向正确的锚点"""
+    heading_index = None
+    # 页面中已有的所有 id（标题及作者手写的锚点）
+    existing_ids = set(tree.xpath('.//@id'))
     
-    # 为所有标题添加 id
-    html_body = add_anchor_ids(html_body)
+    for link in tree.iter('a'):
+        href = link.get('href')
+        # 只处理页内锚点链接；已经指向页面中现有 id 的链接保持不变
+        if not href or not href.startswith('#') or href[1:] in existing_ids:
+            continue
+        
+        # 清理链接文本
+        clean_text = _clean_text(link.text_content())
+        
+        # 查找匹配的标题 id：先精确匹配
+        heading_id = heading_map.get(clean_text)
+        if heading_id is None:
+            # 精确匹配失败时才建立索引（通常所有链接都能精确命中）
+            if heading_index is None:
+                heading_index = build_heading_index(heading_map)
+            heading_id = find_heading_id(clean_text, heading_index)
+        # 找不到时回退为使用文本生成锚点
+        link.set('href', '#' + (heading_id or slugify_chinese(clean_text)))
+
+
+def _protect_document_tags(html_content):
+    """将文档级标签替换为占位符，返回 (替换后的 HTML, 原始标签列表)"""
+    saved = []
     
-    # 修复目录链接
-    html_body = fix_toc_links(html_body)
+    def mark(match):
+        saved.append(match.group(0))
+        return '\ufdd0' + chr(0xe000 + len(saved) - 1)
     
-    # 创建完整的 HTML 文档
-    html_template = f"""<!DOCTYPE html>
+    return _DOC_TAG_RE.sub(mark, html_content), saved
+
+
+def _restore_document_tags(html_content, saved):
+    """将占位符还原为原始的文档级标签"""
+    if not saved:
+        return html_content
+    return _DOC_TAG_MARK_RE.sub(lambda m: saved[ord(m.group(1)) - 0xe000], html_content)
+
+
+# HTML 页面模板（静态部分只构建一次）
+_HTML_PREFIX = """<!DOCTYPE html>
 <html lang="zh-CN">
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>Data Station Web API 技术栈学习笔记</title>
     <style>
-        * {{
+        * {
             margin: 0;
             padding: 0;
             box-sizing: border-box;
-        }}
+        }
         
-        html {{
+        html {
             scroll-behavior: smooth;
-        }}
+        }
         
-        body {{
+        body {
             font-family: -apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, "Helvetica Neue", Arial, sans-serif;
             line-height: 1.6;
             color: #333;
             background-color: #f5f5f5;
             padding: 20px;
-        }}
+        }
         
-        .container {{
+        .container {
             max-width: 1200px;
             margin: 0 auto;
             background: white;
             padding: 40px;
             border-radius: 8px;
             box-shadow: 0 2px 10px rgba(0,0,0,0.1);
-        }}
+        }
         
-        h1 {{
+        h1 {
             color: #2c3e50;
             border-bottom: 3px solid #3498db;
             padding-bottom: 10px;
             margin-bottom: 30px;
             scroll-margin-top: 20px;
-        }}
+        }
         
-        h2 {{
+        h2 {
             color: #34495e;
             margin-top: 40px;
             margin-bottom: 20px;
             padding-bottom: 10px;
             border-bottom: 2px solid #ecf0f1;
             scroll-margin-top: 20px;
-        }}
+        }
         
-        h3 {{
+        h3 {
             color: #555;
             margin-top: 30px;
             margin-bottom: 15px;
             scroll-margin-top: 20px;
-        }}
+        }
         
-        h4, h5, h6 {{
+        h4, h5, h6 {
             color: #666;
             margin-top: 20px;
             margin-bottom: 10px;
             scroll-margin-top: 20px;
-        }}
+        }
         
-        p {{
+        p {
             margin-bottom: 15px;
-        }}
+        }
         
-        ul, ol {{
+        ul, ol {
             margin-left: 30px;
             margin-bottom: 15px;
-        }}
+        }
         
-        li {{
+        li {
             margin-bottom: 8px;
-        }}
+        }
         
-        code {{
+        code {
             background-color: #f4f4f4;
             padding: 2px 6px;
             border-radius: 3px;
             font-family: "Courier New", monospace;
             font-size: 0.9em;
-        }}
+        }
         
-        pre {{
+        pre {
             background-color: #2d2d2d;
             color: #f8f8f2;
             padding: 20px;
             border-radius: 5px;
             overflow-x: auto;
             margin: 20px 0;
-        }}
+        }
         
-        pre code {{
+        pre code {
             background-color: transparent;
             padding: 0;
             color: inherit;
-        }}
+        }
         
-        blockquote {{
+        blockquote {
             border-left: 4px solid #3498db;
             padding-left: 20px;
             margin: 20px 0;
             color: #666;
             font-style: italic;
-        }}
+        }
         
-        table {{
+        table {
             width: 100%;
             border-collapse: collapse;
             margin: 20px 0;
-        }}
+        }
         
-        th, td {{
+        th, td {
             border: 1px solid #ddd;
             padding: 12px;
             text-align: left;
-        }}
+        }
         
-        th {{
+        th {
             background-color: #3498db;
             color: white;
             font-weight: bold;
-        }}
+        }
         
-        tr:nth-child(even) {{
+        tr:nth-child(even) {
             background-color: #f9f9f9;
-        }}
+        }
         
-        a {{
+        a {
             color: #3498db;
             text-decoration: none;
             transition: color 0.2s;
-        }}
+        }
         
-        a:hover {{
+        a:hover {
             color: #2980b9;
             text-decoration: underline;
-        }}
+        }
         
-        a:visited {{
+        a:visited {
             color: #8e44ad;
-        }}
+        }
         
-        hr {{
+        hr {
             border: none;
             border-top: 2px solid #ecf0f1;
             margin: 40px 0;
-        }}
+        }
         
-        .toc {{
+        .toc {
             background-color: #f8f9fa;
             padding: 25px;
             border-radius: 8px;
             margin-bottom: 40px;
             border-left: 4px solid #3498db;
-        }}
+        }
         
-        .toc h2 {{
+        .toc h2 {
             margin-top: 0;
             margin-bottom: 15px;
             font-size: 1.3em;
             border-bottom: none;
-        }}
+        }
         
-        .toc ul {{
+        .toc ul {
             list-style-type: none;
             margin-left: 0;
-        }}
+        }
         
-        .toc li {{
+        .toc li {
             margin-bottom: 8px;
             line-height: 1.8;
-        }}
+        }
         
-        .toc a {{
+        .toc a {
             color: #2c3e50;
             font-weight: 500;
-        }}
+        }
         
-        .toc a:hover {{
+        .toc a:hover {
             color: #3498db;
             text-decoration: underline;
-        }}
+        }
         
-        .toc ul ul {{
+        .toc ul ul {
             margin-left: 20px;
             margin-top: 5px;
-        }}
+        }
         
-        .toc ul ul ul {{
+        .toc ul ul ul {
             margin-left: 20px;
-        }}
+        }
         
         /* 标题锚点样式 */
-        h1[id], h2[id], h3[id], h4[id], h5[id], h6[id] {{
+        h1[id], h2[id], h3[id], h4[id], h5[id], h6[id] {
             position: relative;
-        }}
+        }
         
         h1[id]:hover::before, h2[id]:hover::before, h3[id]:hover::before,
-        h4[id]:hover::before, h5[id]:hover::before, h6[id]:hover::before {{
+        h4[id]:hover::before, h5[id]:hover::before, h6[id]:hover::before {
             content: "🔗";
             position: absolute;
             left: -30px;
             font-size: 0.8em;
             opacity: 0.5;
-        }}
+        }
         
-        @media (max-width: 768px) {{
-            .container {{
+        @media (max-width: 768px) {
+            .container {
                 padding: 20px;
-            }}
+            }
             
-            body {{
+            body {
                 padding: 10px;
-            }}
+            }
             
-            .toc {{
+            .toc {
                 padding: 15px;
-            }}
-        }}
+            }
+        }
     </style>
     <link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/highlight.js/11.9.0/styles/github-dark.min.css">
     <script src="https://cdnjs.cloudflare.com/ajax/libs/highlight.js/11.9.0/highlight.min.js"></script>
@@ -422,12 +447,12 @@ def convert_markdown_to_html(md_file: str, html_file: str):
         hljs.highlightAll();
         
         // 平滑滚动增强
-        document.addEventListener('DOMContentLoaded', function() {{
+        document.addEventListener('DOMContentLoaded', function() {
             // 为所有锚点链接添加平滑滚动
-            document.querySelectorAll('a[href^="#"]').forEach(anchor => {{
-                anchor.addEventListener('click', function (e) {{
+            document.querySelectorAll('a[href^="#"]').forEach(anchor => {
+                anchor.addEventListener('click', function (e) {
                     const href = this.getAttribute('href');
-                    if (href !== '#' && href.length > 1) {{
+                    if (href !== '#' && href.length > 1) {
                         e.preventDefault();
                         
                         // 获取目标 ID（移除 #）
@@ -437,51 +462,133 @@ def convert_markdown_to_html(md_file: str, html_file: str):
                         let target = document.getElementById(targetId);
                         
                         // 如果 getElementById 失败，尝试 querySelector（处理特殊字符）
-                        if (!target) {{
-                            try {{
+                        if (!target) {
+                            try {
                                 // 转义特殊字符用于 CSS 选择器
-                                const escapedId = targetId.replace(/([!"#$%&'()*+,./:;<=>?@[\\\\\\]^`{{|}}~])/g, '\\\\$1');
+                                const escapedId = targetId.replace(/([!"#$%&'()*+,./:;<=>?@[\\\\\\]^`{|}~])/g, '\\\\$1');
                                 target = document.querySelector('#' + escapedId);
-                            }} catch (err) {{
+                            } catch (err) {
                                 console.warn('Failed to query selector for:', href, err);
-                            }}
-                        }}
+                            }
+                        }
                         
-                        if (target) {{
+                        if (target) {
                             const offset = 80; // 偏移量，避免被固定导航栏遮挡
                             const targetPosition = target.getBoundingClientRect().top + window.pageYOffset - offset;
                             
-                            window.scrollTo({{
+                            window.scrollTo({
                                 top: Math.max(0, targetPosition),
                                 behavior: 'smooth'
-                            }});
+                            });
                             
                             // 更新 URL（可选，保持浏览器历史记录）
-                            if (history.pushState) {{
+                            if (history.pushState) {
                                 history.pushState(null, null, href);
-                            }}
-                        }} else {{
+                            }
+                        } else {
                             console.warn('Target not found for href:', href, 'targetId:', targetId);
                             // 回退：尝试直接跳转（浏览器默认行为）
                             window.location.hash = href;
-                        }}
-                    }}
-                }});
-            }});
-        }});
+                        }
+                    }
+                });
+            });
+        });
     </script>
 </head>
 <body>
     <div class="container">
-        {html_body}
+        """
+
+_HTML_SUFFIX = """
     </div>
 </body>
 </html>"""
+
+_HTML_PREFIX_BYTES = _HTML_PREFIX.encode('utf-8')
+_HTML_SUFFIX_BYTES = _HTML_SUFFIX.encode('utf-8')
+
+
+def _read_md(path):
+    """读取 Markdown 文件"""
+    return Path(path).read_text(encoding='utf-8')
+
+
+def convert_markdown_to_html(md_file: str, html_file: str):
+    """将 Markdown 文件转换为 HTML"""
+    md_content = _read_md(md_file)
+    
+    # 转换为 HTML（cmark-gfm，C 实现）
+    # - HARDBREAKS 对应原来的 nl2br
+    # - 不使用 GITHUB_PRE_LANG，保持 <code class="language-xxx">，供 highlight.js 识别
+    # - 代码高亮交给页面中的 hljs.highlightAll()，不再在构建时运行 Pygments
+    html_body = md_to_html(
+        md_content,
+        options=Options.CMARK_OPT_UNSAFE | Options.CMARK_OPT_HARDBREAKS,
+        extensions=['table', 'autolink', 'strikethrough'],
+    )
+    
+    # 解析为 HTML 树（libxml2），后续处理都在树上进行
+    # 注意：整个正文都会经过 libxml2 重新序列化（如 <hr /> 变为 <hr>）
+    html_body, doc_tags = _protect_document_tags(html_body)
+    tree = lxml_html.fragment_fromstring(html_body, create_parent='div')
     
-    with open(html_file, 'w', encoding='utf-8') as f:
-        f.write(html_template)
+    # 为所有标题添加 id，并建立标题映射
+    heading_map = annotate_and_map(tree)
+    
+    # 修复目录链接
+    fix_toc_links(tree, heading_map)
+    
+    # 序列化，并去掉外层包装用的 <div></div>
+    html_body = lxml_html.tostring(tree, encoding='unicode')[5:-6]
+    html_body = _restore_document_tags(html_body, doc_tags)
+    
+    # 写入完整的 HTML 文档
+    # 以二进制方式写入，模板部分使用预先编码好的字节串
+    with open(html_file, 'wb', buffering=1 << 20) as f:
+        f.write(_HTML_PREFIX_BYTES)
+        f.write(html_body.encode('utf-8'))
+        f.write(_HTML_SUFFIX_BYTES)
     
     print(f"✅ 成功将 {md_file} 转换为 {html_file}")
 
+
+def _convert_pair(pair):
+    """供进程池调用：转换 (md_file, html_file)"""
+    convert_markdown_to_html(*pair)
+
+
+def main():
+    """批量转换命令行参数中的 Markdown 文件（支持通配符），默认转换 学习笔记.md"""
+    patterns = sys.argv[1:] or ['学习笔记.md']
+    files = []
+    for pattern in patterns:
+        matched = sorted(glob.glob(pattern))
+        if not matched:
+            sys.exit(f'未找到文件: {pattern}')
+        files.extend(matched)
+    
+    # 去重（同一文件可能被多个模式匹配），并跳过输出路径与输入相同的文件（如 *.html）
+    unique_files = {}
+    for f in files:
+        unique_files.setdefault(os.path.abspath(f), f)
+    pairs = []
+    for f in unique_files.values():
+        html_file = os.path.splitext(f)[0] + '.html'
+        if os.path.abspath(html_file) == os.path.abspath(f):
+            print(f"⚠️ 跳过 {f}：输出文件与输入文件相同", file=sys.stderr)
+            continue
+        pairs.append((f, html_file))
+    
+    if len(pairs) <= 1:
+        for pair in pairs:
+            _convert_pair(pair)
+        return
+    
+    # 各文件互不依赖，按 CPU 核数并行转换
+    with ProcessPoolExecutor() as pool:
+        list(pool.map(_convert_pair, pairs))
+
+
 if __name__ == '__main__':
-    convert_markdown_to_html('学习笔记.md', '学习笔记.html')
\ No newline at end of file
+    main()
\ No newline at end of file